@@ -1,14 +1,19 @@
 # This program uses exiftool: https://exiftool.org/
 
 import argparse
+import concurrent.futures
 import logging
 import os
+import queue
 import shutil
 import sys
 import tempfile
 from os.path import exists, basename, isdir, join
 import subprocess
 
+BUFFER_SIZE = 1024 * 1024  # Size of the buffer used when copying file contents (1 MiB)
+USE_SENDFILE = hasattr(os, 'sendfile') and sys.platform.startswith('linux')  # os.sendfile can only write to regular files on Linux
+
 def source_path(relative_path):
     """
     Get the absolute path of the resource file, supporting the case when packaged as an exe.
@@ -21,16 +26,30 @@ def source_path(relative_path):
         base_path = os.path.dirname(os.path.abspath(__file__))  # Get the directory path of the script file
     return os.path.join(base_path, relative_path)  # Join into a complete path and return
 
+def find_exiftool():
+    """
+    Find exiftool, preferring a copy next to this program over the one installed on the system.
+    Only the Windows build (exiftool.exe) is bundled. On other platforms the Unix exiftool is used
+    if it was placed at exiftool/exiftool, otherwise the exiftool found on the PATH.
+    :return: Path of exiftool
+    """
+    bundled_path = source_path(os.path.join('exiftool', 'exiftool.exe' if os.name == 'nt' else 'exiftool'))  # Path of the exiftool next to this program
+    if exists(bundled_path):  # If the exiftool next to this program exists
+        return bundled_path
+    return shutil.which('exiftool') or bundled_path  # Otherwise use the exiftool on the PATH, if any
+
+EXIFTOOL_PATH = find_exiftool()  # Path of exiftool
+
 def validate_directory(dir):
     """
     Verify if the directory exists and is valid.
     :param dir: Directory path to be validated
     """
     if not exists(dir):  # If the directory does not exist
-        logging.error("Path does not exist: {}".format(dir))  # Log the error
+        logging.error("Path does not exist: %s", dir)  # Log the error
         sys.exit(1)  # Exit the program
     if not isdir(dir):  # If the path is not a directory
-        logging.error("Path is not a directory: {}".format(dir))  # Log the error
+        logging.error("Path is not a directory: %s", dir)  # Log the error
         sys.exit(1)  # Exit the program
 
 def validate_media(photo_path, video_path):
@@ -41,37 +60,85 @@ def validate_media(photo_path, video_path):
     :param video_path: Path of the video file
     :return: True if the photo and video files are valid, otherwise False
     """
-    if not exists(photo_path):  # If the photo file does not exist
-        logging.error("Photo does not exist: {}".format(photo_path))  # Log the error
-        return False  # Return False
-    if not exists(video_path):  # If the video file does not exist
-        logging.error("Video does not exist: {}".format(video_path))  # Log the error
-        return False  # Return False
     if not photo_path.lower().endswith(('.jpg', '.jpeg')):  # If the photo file is not in JPEG format
-        logging.error("Photo is not in JPEG format: {}".format(photo_path))  # Log the error
+        logging.error("Photo is not in JPEG format: %s", photo_path)  # Log the error
         return False  # Return False
     if not video_path.lower().endswith(('.mov', '.mp4')):  # If the video file is not in MOV or MP4 format
-        logging.error("Video is not in MOV or MP4 format: {}".format(video_path))  # Log the error
+        logging.error("Video is not in MOV or MP4 format: %s", video_path)  # Log the error
+        return False  # Return False
+    if not exists(photo_path):  # If the photo file does not exist
+        logging.error("Photo does not exist: %s", photo_path)  # Log the error
+        return False  # Return False
+    if not exists(video_path):  # If the video file does not exist
+        logging.error("Video does not exist: %s", video_path)  # Log the error
         return False  # Return False
     return True  # Return True
 
-def merge_files(photo_path, video_path, output_path):
+def copy_file_content(infile, outfile):
+    """
+    Copy the content of infile to the current position of outfile.
+    On Linux the data is copied inside the kernel with os.sendfile, otherwise shutil.copyfileobj is used.
+    :param infile: File object opened for reading in binary mode, positioned at the start of the file
+    :param outfile: File object opened for writing in binary mode
+    :return: None
+    """
+    if USE_SENDFILE:
+        outfile.flush()  # Write any buffered data before writing to the file descriptor directly
+        in_fd, out_fd = infile.fileno(), outfile.fileno()
+        count = max(os.fstat(in_fd).st_size, BUFFER_SIZE)
+        offset = 0
+        try:
+            while True:  # Copy until the end of the input file
+                sent = os.sendfile(out_fd, in_fd, offset, count)
+                if sent == 0:
+                    return
+                offset += sent
+        except OSError:
+            if offset > 0:
+                raise
+            # sendfile is not supported for these files, fall back to copying in chunks
+    shutil.copyfileobj(infile, outfile, BUFFER_SIZE)  # Copy the content in chunks
+
+def preallocate_file(outfile, offset, length):
+    """
+    Reserve disk space for a file before writing it, so the file system can allocate it in one go.
+    Only done where os.posix_fallocate is available, other platforms write the file as usual.
+    :param outfile: File object opened for writing
+    :param offset: Byte offset where the reserved space starts
+    :param length: Number of bytes to reserve
+    :return: None
+    """
+    if hasattr(os, 'posix_fallocate') and length > 0:  # If preallocation is available and there is something to reserve
+        try:
+            os.posix_fallocate(outfile.fileno(), offset, length)  # Reserve the disk space
+        except OSError:  # The file system does not support preallocation
+            pass
+
+def copy_photo(photo_path, out_path):
     """
-    Merge the photo and video files together by appending the video to the end of the photo.
-    Write the output to the specified output path.
+    Copy the photo to the output file. The video is appended to the copy once its XMP metadata is written.
     :param photo_path: Path of the photo
-    :param video_path: Path of the video
-    :param output_path: Path of the output directory
-    :return: The filename of the merged output file
+    :param out_path: Path of the output file
+    :return: None
     """
-    logging.info("Merging {} and {}.".format(photo_path, video_path))  # Log the merge operation
-    out_path = os.path.join(output_path, "{}".format(basename(photo_path)))  # Generate the output file path
+    logging.info("Copying %s.", photo_path)  # Log the copy operation
     os.makedirs(os.path.dirname(out_path), exist_ok=True)  # Ensure the output directory exists
-    with open(out_path, "wb") as outfile, open(photo_path, "rb") as photo, open(video_path, "rb") as video:
-        outfile.write(photo.read())  # Write the photo content
-        outfile.write(video.read())  # Write the video content
+    shutil.copyfile(photo_path, out_path)  # Copy the photo content
+
+def append_video(video_path, out_path):
+    """
+    Append the video to the end of the output file, which then becomes the motion photo.
+    :param video_path: Path of the video
+    :param out_path: Path of the output file
+    :return: None
+    """
+    logging.info("Appending %s to %s.", video_path, out_path)  # Log the append operation
+    with open(out_path, "r+b", buffering=BUFFER_SIZE) as outfile, open(video_path, "rb", buffering=BUFFER_SIZE) as video:
+        outfile.seek(0, os.SEEK_END)  # Write after the photo (not opened in append mode, which os.sendfile does not support)
+        preallocate_file(outfile, outfile.tell(), os.fstat(video.fileno()).st_size)  # Reserve the space of the video
+        copy_file_content(video, outfile)  # Write the video content
+        outfile.truncate()  # Drop any reserved space that was not written
     logging.info("Photo and video merged.")  # Log the completion of the merge
-    return out_path  # Return the merged file path
 
 def create_exiftool_config():
     """
@@ -111,17 +178,17 @@ def add_xmp_metadata(merged_file, offset, config_path):
     """
     Add XMP metadata to the merged image, indicating the byte offset where the video starts in the file.
     Use exiftool to write the metadata.
-    :param merged_file: Path of the merged photo and video file
+    :param merged_file: Path of the output file, containing only the photo at this point
     :param offset: Byte offset from the end of the file to the start of the video part
     :param config_path: Path of the ExifTool configuration file
-    :return: None
+    :return: True if the XMP metadata was written, otherwise False
     """
-    exiftool_path = source_path('exiftool\\exiftool.exe')  # Get the path of exiftool
-    logging.info("ExifTool path: {}".format(exiftool_path))
-    logging.info("Config file path: {}".format(config_path))
+    logging.info("ExifTool path: %s", EXIFTOOL_PATH)
+    logging.info("Config file path: %s", config_path)
+    # -fast/-fast2 is not passed: exiftool only applies it when extracting metadata, it has no effect when writing.
     try:
         result = subprocess.run([
-            exiftool_path,  # Path of exiftool
+            EXIFTOOL_PATH,  # Path of exiftool
             '-config', config_path,  # Path of the configuration file
             '-XMP-GCamera:MicroVideo=1',  # Set the MicroVideo flag
             '-XMP-GCamera:MicroVideoVersion=1',  # Set the MicroVideo version
@@ -130,63 +197,236 @@ def add_xmp_metadata(merged_file, offset, config_path):
             '-overwrite_original',  # Overwrite the original file, do not generate a backup
             merged_file  # Target file
         ], check=True, capture_output=True, text=True)  # Ensure the command runs successfully
-        logging.info("ExifTool output: {}".format(result.stdout))
+        logging.info("ExifTool output: %s", result.stdout)
         logging.info("XMP metadata added to the file.")  # Log the success
+        return True  # Return True
     except subprocess.CalledProcessError as e:
-        logging.error("Failed to add XMP metadata: {}".format(e))  # Log the failure
-        logging.error("ExifTool error output: {}".format(e.stderr))
+        logging.error("Failed to add XMP metadata: %s", e)  # Log the failure
+        logging.error("ExifTool error output: %s", e.stderr)
+        return False  # Return False
 
-def convert(photo_path, video_path, output_path):
+def start_exiftool(config_path):
+    """
+    Start a persistent exiftool process in -stay_open mode, so that a single process can write the metadata of many files.
+    Arguments are sent through its standard input, see queue_xmp_metadata.
+    :param config_path: Path of the ExifTool configuration file
+    :return: The running exiftool process
+    """
+    logging.info("ExifTool path: %s", EXIFTOOL_PATH)
+    logging.info("Config file path: %s", config_path)
+    return subprocess.Popen([
+        EXIFTOOL_PATH,  # Path of exiftool
+        '-config', config_path,  # Path of the configuration file
+        '-stay_open', 'True',  # Keep reading arguments after each command is executed
+        '-@', '-',  # Read the arguments from the standard input
+        '-common_args', '-charset', 'filename=utf8',  # File names are sent as UTF-8 text
+    ], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding='utf-8')
+
+def queue_xmp_metadata(exiftool_process, merged_file, offset):
+    """
+    Add XMP metadata to the merged image through a persistent exiftool process started by start_exiftool.
+    Waits until exiftool has finished writing the file.
+    :param exiftool_process: The running exiftool process
+    :param merged_file: Path of the output file, containing only the photo at this point
+    :param offset: Byte offset from the end of the file to the start of the video part
+    :return: True if the XMP metadata was written, otherwise False
+    """
+    if exiftool_process.poll() is not None:  # If exiftool has already exited
+        logging.error("Failed to add XMP metadata, ExifTool is not running: %s", merged_file)  # Log the failure
+        return False  # Return False
+    exiftool_process.stdin.write(  # One argument per line
+        "-XMP-GCamera:MicroVideo=1\n"  # Set the MicroVideo flag
+        "-XMP-GCamera:MicroVideoVersion=1\n"  # Set the MicroVideo version
+        "-XMP-GCamera:MicroVideoOffset={}\n"  # Set the MicroVideo offset
+        "-XMP-GCamera:MicroVideoPresentationTimestampUs=1500000\n"  # Set the presentation timestamp
+        "-overwrite_original\n"  # Overwrite the original file, do not generate a backup
+        "{}\n"  # Target file
+        "-execute\n".format(offset, merged_file))  # Execute the command
+    exiftool_process.stdin.flush()  # Make sure exiftool receives the whole command
+
+    output = []
+    for line in exiftool_process.stdout:  # Read the output until exiftool reports it is ready
+        if line.strip() == "{ready}":
+            break
+        output.append(line)
+    else:  # exiftool exited before finishing the command
+        output.append("Error: ExifTool exited unexpectedly\n")
+    logging.info("ExifTool output: %s", "".join(output))
+    if any(line.startswith("Error") for line in output):  # exiftool reports failures as "Error: ..." lines
+        logging.error("Failed to add XMP metadata: %s", merged_file)  # Log the failure
+        logging.error("ExifTool error output: %s", "".join(output))
+        return False  # Return False
+    logging.info("XMP metadata added to the file.")  # Log the success
+    return True  # Return True
+
+def stop_exiftool(exiftool_process):
+    """
+    Stop a persistent exiftool process started by start_exiftool.
+    :param exiftool_process: The running exiftool process
+    :return: None
+    """
+    if exiftool_process.poll() is None:  # If exiftool is still running
+        exiftool_process.communicate("-stay_open\nFalse\n")  # Tell exiftool to exit and wait for it
+
+def convert(photo_path, video_path, output_path, config_path, exiftool_process=None, force=False):
     """
     Perform the conversion process to merge the files into a Google Motion Photo.
     :param photo_path: Path of the photo to be merged
     :param video_path: Path of the video to be merged
     :param output_path: Path of the output directory
+    :param config_path: Path of the ExifTool configuration file
+    :param exiftool_process: Persistent exiftool process to use, if None a new exiftool process is run
+    :param force: Convert even if the output file is up to date
     :return: True if the conversion is successful, otherwise False
     """
-    merged = merge_files(photo_path, video_path, output_path)  # Merge the photo and video files
-    photo_filesize = os.path.getsize(photo_path)  # Get the photo file size
-    merged_filesize = os.path.getsize(merged)  # Get the merged file size
+    out_path = os.path.join(output_path, basename(photo_path))  # Path of the output file
+    if not force and exists(out_path):  # If the output file already exists and may be kept
+        out_stat, photo_stat, video_stat = os.stat(out_path), os.stat(photo_path), os.stat(video_path)  # Get the file information
+        # The output is up to date if it is newer than the photo and the video, and large enough to contain both,
+        # so that a plain copy of the photo (for example from --copyall) is still converted.
+        if out_stat.st_mtime >= max(photo_stat.st_mtime, video_stat.st_mtime) and out_stat.st_size >= photo_stat.st_size + video_stat.st_size:
+            logging.info("Output file is up to date, skipping: %s", out_path)  # Log the skip
+            return True  # The output was converted by an earlier run
 
-    # The 'offset' field in XMP metadata should be the byte offset from the end of the file to the start of the video part in the merged file.
-    # Merged size - photo size = offset.
-    offset = merged_filesize - photo_filesize  # Calculate the offset
-    config_path = create_exiftool_config()  # Create the ExifTool configuration file
-    add_xmp_metadata(merged, offset, config_path)  # Add XMP metadata
-    os.remove(config_path)  # Delete the temporary configuration file
+    # The output is built under a temporary name and only renamed once it is complete,
+    # so a failed or interrupted conversion never leaves a motion photo without its video.
+    part_path = out_path + ".part"  # Path of the incomplete output file
+    try:
+        # The XMP metadata is written to a copy of the photo before the video is appended,
+        # so that exiftool only has to rewrite the photo and the video is only written once.
+        copy_photo(photo_path, part_path)  # Copy the photo
 
-def matching_video(photo_path):
+        # The 'offset' field in XMP metadata should be the byte offset from the end of the file to the start of the video part in the merged file.
+        # The video is appended at the end of the file, so the offset is the video size.
+        offset = os.path.getsize(video_path)  # Calculate the offset
+        if exiftool_process is not None:  # If a persistent exiftool process is provided
+            success = queue_xmp_metadata(exiftool_process, part_path, offset)  # Add XMP metadata through it
+        else:
+            success = add_xmp_metadata(part_path, offset, config_path)  # Add XMP metadata
+        if not success:  # If the XMP metadata could not be written
+            return False  # Return False
+        append_video(video_path, part_path)  # Append the video
+        os.replace(part_path, out_path)  # Move the complete output file into place
+    finally:
+        if exists(part_path):  # If the conversion did not complete
+            os.remove(part_path)  # Delete the incomplete output file, so the pair is converted again next time
+    return True  # Return True
+
+def convert_group(pairs, output_path, config_path, exiftool_processes):
     """
-    Find the matching video file for the given photo.
-    :param photo_path: Path of the photo file
-    :return: Path of the matching video file, or an empty string if not found
+    Convert photo/video pairs one after another, using a persistent exiftool process taken from the queue.
+    The pairs of a group may write to the same output file, so they must not be converted in parallel.
+    :param pairs: List of (photo, video) path tuples
+    :param output_path: Path of the output directory
+    :param config_path: Path of the ExifTool configuration file
+    :param exiftool_processes: Queue of running exiftool processes that are not in use
+    :return: None
     """
-    base = os.path.splitext(photo_path)[0]  # Get the base name of the photo file (without extension)
-    logging.info("Looking for a video with the same name: {}".format(base))  # Log the search
-    for ext in ['.mov', '.mp4', '.MOV', '.MP4']:  # List of supported extensions
-        video_path = base + ext  # Construct the video file path
-        if os.path.exists(video_path):  # If the video file exists
-            return video_path  # Return the video file path
-    return ""  # If no matching video file is found, return an empty string
+    exiftool_process = exiftool_processes.get()  # Take an exiftool process that is not in use
+    try:
+        written = []  # Output files written by the previous pairs of the group
+        for photo_path, video_path in pairs:  # Traverse the file pairs
+            out_path = os.path.join(output_path, basename(photo_path))  # Path of the output file
+            # An output file written by a previous pair is overwritten, so the last pair wins as when converting one by one
+            force = exists(out_path) and any(exists(path) and os.path.samefile(out_path, path) for path in written)
+            if convert(photo_path, video_path, output_path, config_path, exiftool_process, force):  # Convert the file pair
+                written.append(out_path)
+    finally:
+        exiftool_processes.put(exiftool_process)  # Give the exiftool process back
+
+def convert_pairs(pairs, output_path, config_path):
+    """
+    Convert the photo/video pairs in parallel, each worker thread using its own persistent exiftool process.
+    :param pairs: List of (photo, video) path tuples
+    :param output_path: Path of the output directory
+    :param config_path: Path of the ExifTool configuration file
+    :return: None
+    """
+    # Pairs whose photos have the same name, ignoring case, may write to the same output file (depending on the file system),
+    # so they are grouped and each group is converted by a single worker thread
+    groups = {}  # Groups of file pairs, by lower case photo name
+    for pair in pairs:
+        groups.setdefault(basename(pair[0]).lower(), []).append(pair)
+    if len(groups) == 0:  # If there is nothing to convert
+        return
+    workers = min(len(groups), os.cpu_count() or 1)  # Number of worker threads
+    exiftool_processes = queue.Queue()  # exiftool processes that are not in use
+    try:
+        for _ in range(workers):
+            exiftool_processes.put(start_exiftool(config_path))  # Start one exiftool process per worker thread
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(convert_group, group, output_path, config_path, exiftool_processes) for group in groups.values()]
+            for future in futures:
+                future.result()  # Raise any exception from the worker threads
+    finally:
+        while not exiftool_processes.empty():
+            stop_exiftool(exiftool_processes.get())  # Stop the exiftool processes
+
+def scan_directory(dir_path):
+    """
+    Traverse the specified directory and its subdirectories with os.scandir, like os.walk but keeping the os.DirEntry objects.
+    Directories that cannot be read are skipped, and symbolic links to directories are not followed.
+    :param dir_path: Directory to traverse
+    :return: Generator of lists of os.DirEntry, one list with the files of each directory
+    """
+    pending = [dir_path]  # Directories still to be traversed, a flat directory is listed once without recursion
+    while pending:
+        current = pending.pop()  # Take the next directory
+        files = []  # Files in this directory
+        subdirs = []  # Subdirectories of this directory
+        try:
+            with os.scandir(current) as entries:  # List the directory
+                for entry in entries:
+                    if entry.is_dir():  # If the entry is a directory
+                        if not entry.is_symlink():  # Do not follow symbolic links
+                            subdirs.append(entry.path)
+                    else:
+                        files.append(entry)
+        except OSError:  # If the directory cannot be read
+            continue
+        yield files
+        pending.extend(reversed(subdirs))  # Traverse the subdirectories next, in the order they were listed
 
 def process_directory(file_dir):
     """
     Recursively traverse the files in the specified directory, generating a list of tuples of (photo, video) paths that can be converted.
     :param file_dir: Directory to search for photos/videos to convert
-    :return: List of matching photo/video pairs
+    :return: List of matching photo/video pairs, and the set of all files in the directory
     """
-    logging.info("Processing directory: {}".format(file_dir))  # Log the directory processing
+    logging.info("Processing directory: %s", file_dir)  # Log the directory processing
     
     file_pairs = []  # Initialize the list of file pairs
-    for root, dirs, files in os.walk(file_dir):  # Recursively traverse the directory
-        for file in files:  # Traverse the files
-            file_fullpath = join(root, file)  # Get the full path of the file
-            if file.lower().endswith(('.jpg', '.jpeg')) and matching_video(file_fullpath) != "":  # If the file is in JPEG format and has a matching video file
-                file_pairs.append((file_fullpath, matching_video(file_fullpath)))  # Add to the list of file pairs
+    all_files = set()  # Initialize the set of all files
+    for files in scan_directory(file_dir):  # Recursively traverse the directory
+        photos = []  # Photos in this directory, as (lower case name without extension, path)
+        videos = {}  # Videos in this directory, by lower case name without extension
+        for entry in files:  # Traverse the files
+            all_files.add(entry.path)  # Add to the set of all files
+            name, ext = os.path.splitext(entry.name.lower())  # Split the lower case file name into name and extension
+            if ext in ('.jpg', '.jpeg'):  # If the file is in JPEG format
+                photos.append((name, entry.path))
+            elif ext in ('.mov', '.mp4') and (ext == '.mov' or name not in videos):  # If the file is in MOV or MP4 format, MOV is preferred when both exist
+                videos[name] = entry.path
+        for name, photo_path in photos:  # Traverse the photos of this directory
+            video_path = videos.get(name)  # Find the video with the same name
+            if video_path is not None:  # If there is a matching video file
+                file_pairs.append((photo_path, video_path))  # Add to the list of file pairs
+
+    logging.info("Found %s pairs of files.", len(file_pairs))  # Log the number of file pairs found
+    logging.info("Subset of found image/video pairs: %s", file_pairs[0:9])  # Log a subset of the found file pairs
+    return file_pairs, all_files  # Return the list of file pairs and the set of all files
 
-    logging.info("Found {} pairs of files.".format(len(file_pairs)))  # Log the number of file pairs found
-    logging.info("Subset of found image/video pairs: {}".format(str(file_pairs[0:9])))  # Log a subset of the found file pairs
-    return file_pairs  # Return the list of file pairs
+def copy_files(files, output_path):
+    """
+    Copy files to the output directory one after another, retaining the original files' metadata.
+    :param files: List of paths of the files to copy
+    :param output_path: Path of the output directory
+    :return: None
+    """
+    for file in files:  # Traverse the files
+        file_name = basename(file)  # Get the file name
+        destination_path = join(output_path, file_name)  # Construct the target path
+        shutil.copy2(file, destination_path)  # Copy the file to the target path (retain the original file's metadata)
 
 def main(args):
     """
@@ -201,29 +441,34 @@ def main(args):
 
     if args.dir is not None:  # If the directory argument is specified
         validate_directory(args.dir)  # Validate the directory
-        pairs = process_directory(args.dir)  # Process the directory to get the file pairs
-        processed_files = set()  # Initialize the set of processed files
-        for pair in pairs:  # Traverse the file pairs
-            if validate_media(pair[0], pair[1]):  # Validate the file pair
-                convert(pair[0], pair[1], outdir)  # Convert the file pair
-                processed_files.add(pair[0])  # Add the processed file to the set
-                processed_files.add(pair[1])  # Add the processed file to the set
+        pairs, all_files = process_directory(args.dir)  # Process the directory to get the file pairs and all files
+        pairs = [pair for pair in pairs if validate_media(pair[0], pair[1])]  # Keep the valid file pairs
+        processed_files = set(file for pair in pairs for file in pair)  # Initialize the set of processed files
+        config_path = create_exiftool_config()  # Create the ExifTool configuration file
+        try:
+            convert_pairs(pairs, outdir, config_path)  # Convert the file pairs
+        finally:
+            os.remove(config_path)  # Delete the temporary configuration file
 
         if args.copyall:  # If the copy all files argument is specified
             # Copy the remaining files to the output directory
-            all_files = set(join(root, file) for root, dirs, files in os.walk(args.dir) for file in files)  # Get the set of all files
             remaining_files = all_files - processed_files  # Calculate the set of remaining files
 
-            logging.info("Found {} remaining files to be copied.".format(len(remaining_files)))  # Log the number of remaining files
+            logging.info("Found %s remaining files to be copied.", len(remaining_files))  # Log the number of remaining files
 
             if len(remaining_files) > 0:  # If there are remaining files
                 # Ensure the target directory exists
                 os.makedirs(outdir, exist_ok=True)  # Create the output directory
                 
-                for file in remaining_files:  # Traverse the remaining files
-                    file_name = basename(file)  # Get the file name
-                    destination_path = join(outdir, file_name)  # Construct the target path
-                    shutil.copy2(file, destination_path)  # Copy the file to the target path (retain the original file's metadata)
+                # Files with the same name, ignoring case, may be copied to the same target path (depending on the file system),
+                # so they are grouped and each group is copied by a single worker thread
+                groups = {}  # Groups of files, by lower case file name
+                for file in remaining_files:
+                    groups.setdefault(basename(file).lower(), []).append(file)
+                with concurrent.futures.ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:  # Copy several files at once
+                    futures = [executor.submit(copy_files, group, outdir) for group in groups.values()]  # Copy the files to the target path
+                    for future in futures:
+                        future.result()  # Raise any exception from the worker threads
     else:  # If the directory argument is not specified
         if args.photo is None and args.video is None:  # If photo and video arguments are not provided
             logging.error("Need to provide --dir or both --photo and --video.")  # Log the error
@@ -234,7 +479,11 @@ def main(args):
             sys.exit(1)  # Exit the process
 
         if validate_media(args.photo, args.video):  # Validate the files
-            convert(args.photo, args.video, outdir)  # Convert the files
+            config_path = create_exiftool_config()  # Create the ExifTool configuration file
+            try:
+                convert(args.photo, args.video, outdir, config_path)  # Convert the files
+            finally:
+                os.remove(config_path)  # Delete the temporary configuration file
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(
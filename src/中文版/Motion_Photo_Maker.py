@@ -1,14 +1,19 @@
 # 本程序使用exiftool：https://exiftool.org/
 
 import argparse
+import concurrent.futures
 import logging
 import os
+import queue
 import shutil
 import sys
 import tempfile
 from os.path import exists, basename, isdir, join
 import subprocess
 
+BUFFER_SIZE = 1024 * 1024  # 复制文件内容时使用的缓冲区大小（1 MiB）
+USE_SENDFILE = hasattr(os, 'sendfile') and sys.platform.startswith('linux')  # 只有在Linux上os.sendfile才能写入普通文件
+
 def source_path(relative_path):
     """
     获取资源文件的绝对路径，支持打包为exe后的情况。
@@ -21,16 +26,30 @@ def source_path(relative_path):
         base_path = os.path.dirname(os.path.abspath(__file__))  # 获取脚本文件的目录路径
     return os.path.join(base_path, relative_path)  # 拼接成完整路径并返回
 
+def find_exiftool():
+    """
+    查找exiftool，优先使用本程序旁边的exiftool，而不是系统中安装的exiftool。
+    只附带了Windows版本（exiftool.exe）。在其他平台上，如果Unix版exiftool放在exiftool/exiftool，
+    则使用它，否则使用PATH中的exiftool。
+    :return: exiftool的路径
+    """
+    bundled_path = source_path(os.path.join('exiftool', 'exiftool.exe' if os.name == 'nt' else 'exiftool'))  # 本程序旁边的exiftool的路径
+    if exists(bundled_path):  # 如果本程序旁边的exiftool存在
+        return bundled_path
+    return shutil.which('exiftool') or bundled_path  # 否则使用PATH中的exiftool（如果有）
+
+EXIFTOOL_PATH = find_exiftool()  # exiftool的路径
+
 def validate_directory(dir):
     """
     验证目录是否存在且是有效的目录。
     :param dir: 要验证的目录路径
     """
     if not exists(dir):  # 如果目录不存在
-        logging.error("路径不存在: {}".format(dir))  # 记录错误日志
+        logging.error("路径不存在: %s", dir)  # 记录错误日志
         sys.exit(1)  # 退出程序
     if not isdir(dir):  # 如果路径不是目录
-        logging.error("路径不是目录: {}".format(dir))  # 记录错误日志
+        logging.error("路径不是目录: %s", dir)  # 记录错误日志
         sys.exit(1)  # 退出程序
 
 def validate_media(photo_path, video_path):
@@ -41,36 +60,85 @@ def validate_media(photo_path, video_path):
     :param video_path: 视频文件的路径
     :return: 如果照片和视频文件有效，则返回True，否则返回False
     """
-    if not exists(photo_path):  # 如果照片文件不存在
-        logging.error("照片不存在: {}".format(photo_path))  # 记录错误日志
-        return False  # 返回False
-    if not exists(video_path):  # 如果视频文件不存在
-        logging.error("视频不存在: {}".format(video_path))  # 记录错误日志
-        return False  # 返回False
     if not photo_path.lower().endswith(('.jpg', '.jpeg')):  # 如果照片文件不是JPEG格式
-        logging.error("照片不是JPEG格式: {}".format(photo_path))  # 记录错误日志
+        logging.error("照片不是JPEG格式: %s", photo_path)  # 记录错误日志
         return False  # 返回False
     if not video_path.lower().endswith(('.mov', '.mp4')):  # 如果视频文件不是MOV或MP4格式
-        logging.error("视频不是MOV或MP4格式: {}".format(video_path))  # 记录错误日志
+        logging.error("视频不是MOV或MP4格式: %s", video_path)  # 记录错误日志
+        return False  # 返回False
+    if not exists(photo_path):  # 如果照片文件不存在
+        logging.error("照片不存在: %s", photo_path)  # 记录错误日志
+        return False  # 返回False
+    if not exists(video_path):  # 如果视频文件不存在
+        logging.error("视频不存在: %s", video_path)  # 记录错误日志
         return False  # 返回False
     return True  # 返回True
 
-def merge_files(photo_path, video_path, output_path):
+def copy_file_content(infile, outfile):
+    """
+    将infile的内容复制到outfile的当前位置。
+    在Linux上使用os.sendfile在内核中复制数据，否则使用shutil.copyfileobj。
+    :param infile: 以二进制读取模式打开、位于文件开头的文件对象
+    :param outfile: 以二进制写入模式打开的文件对象
+    :return: None
+    """
+    if USE_SENDFILE:
+        outfile.flush()  # 直接写入文件描述符之前先写出缓冲的数据
+        in_fd, out_fd = infile.fileno(), outfile.fileno()
+        count = max(os.fstat(in_fd).st_size, BUFFER_SIZE)
+        offset = 0
+        try:
+            while True:  # 复制到输入文件末尾为止
+                sent = os.sendfile(out_fd, in_fd, offset, count)
+                if sent == 0:
+                    return
+                offset += sent
+        except OSError:
+            if offset > 0:
+                raise
+            # 这些文件不支持sendfile，改为分块复制
+    shutil.copyfileobj(infile, outfile, BUFFER_SIZE)  # 分块复制内容
+
+def preallocate_file(outfile, offset, length):
+    """
+    在写入文件之前预留磁盘空间，使文件系统可以一次性分配。
+    只在os.posix_fallocate可用时执行，其他平台照常写入文件。
+    :param outfile: 以写入模式打开的文件对象
+    :param offset: 预留空间开始的字节偏移量
+    :param length: 要预留的字节数
+    :return: None
+    """
+    if hasattr(os, 'posix_fallocate') and length > 0:  # 如果可以预分配且有需要预留的空间
+        try:
+            os.posix_fallocate(outfile.fileno(), offset, length)  # 预留磁盘空间
+        except OSError:  # 文件系统不支持预分配
+            pass
+
+def copy_photo(photo_path, out_path):
     """
-    将照片和视频文件合并在一起，通过将视频附加到照片的末尾。将输出写入指定的输出路径。
+    将照片复制到输出文件。写入XMP元数据后再将视频附加到副本。
     :param photo_path: 照片的路径
-    :param video_path: 视频的路径
-    :param output_path: 输出目录的路径
-    :return: 合并输出文件的文件名
+    :param out_path: 输出文件的路径
+    :return: None
     """
-    logging.info("正在合并 {} 和 {}.".format(photo_path, video_path))  # 记录合并操作日志
-    out_path = os.path.join(output_path, "{}".format(basename(photo_path)))  # 生成输出文件路径
+    logging.info("正在复制 %s.", photo_path)  # 记录复制操作日志
     os.makedirs(os.path.dirname(out_path), exist_ok=True)  # 确保输出目录存在
-    with open(out_path, "wb") as outfile, open(photo_path, "rb") as photo, open(video_path, "rb") as video:
-        outfile.write(photo.read())  # 写入照片内容
-        outfile.write(video.read())  # 写入视频内容
+    shutil.copyfile(photo_path, out_path)  # 复制照片内容
+
+def append_video(video_path, out_path):
+    """
+    将视频附加到输出文件的末尾，使其成为动态照片。
+    :param video_path: 视频的路径
+    :param out_path: 输出文件的路径
+    :return: None
+    """
+    logging.info("正在将 %s 附加到 %s.", video_path, out_path)  # 记录附加操作日志
+    with open(out_path, "r+b", buffering=BUFFER_SIZE) as outfile, open(video_path, "rb", buffering=BUFFER_SIZE) as video:
+        outfile.seek(0, os.SEEK_END)  # 在照片之后写入（不使用追加模式打开，因为os.sendfile不支持）
+        preallocate_file(outfile, outfile.tell(), os.fstat(video.fileno()).st_size)  # 预留视频的空间
+        copy_file_content(video, outfile)  # 写入视频内容
+        outfile.truncate()  # 去掉未写入的预留空间
     logging.info("已合并照片和视频。")  # 记录合并完成日志
-    return out_path  # 返回合并后的文件路径
 
 def create_exiftool_config():
     """
@@ -110,17 +178,17 @@ def add_xmp_metadata(merged_file, offset, config_path):
     """
     向合并的图像添加XMP元数据，指示文件中视频开始的字节偏移量。
     使用exiftool写入元数据。
-    :param merged_file: 合并后的照片和视频文件的路径
+    :param merged_file: 输出文件的路径，此时只包含照片
     :param offset: 从文件末尾到视频开始部分的字节偏移量
     :param config_path: ExifTool配置文件的路径
-    :return: None
+    :return: 如果写入了XMP元数据，则返回True，否则返回False
     """
-    exiftool_path = source_path('exiftool\\exiftool.exe')  # 获取exiftool的路径
-    logging.info("ExifTool路径: {}".format(exiftool_path))
-    logging.info("配置文件路径: {}".format(config_path))
+    logging.info("ExifTool路径: %s", EXIFTOOL_PATH)
+    logging.info("配置文件路径: %s", config_path)
+    # 不传递-fast/-fast2：exiftool只在提取元数据时使用该选项，写入时无效。
     try:
         result = subprocess.run([
-            exiftool_path,  # exiftool的路径
+            EXIFTOOL_PATH,  # exiftool的路径
             '-config', config_path,  # 配置文件的路径
             '-XMP-GCamera:MicroVideo=1',  # 设置MicroVideo标志
             '-XMP-GCamera:MicroVideoVersion=1',  # 设置MicroVideo版本
@@ -129,63 +197,236 @@ def add_xmp_metadata(merged_file, offset, config_path):
             '-overwrite_original',  # 覆盖原文件，不生成备份
             merged_file  # 目标文件
         ], check=True, capture_output=True, text=True)  # 确保命令执行成功
-        logging.info("ExifTool输出: {}".format(result.stdout))
+        logging.info("ExifTool输出: %s", result.stdout)
         logging.info("已向文件添加XMP元数据。")  # 记录成功日志
+        return True  # 返回True
     except subprocess.CalledProcessError as e:
-        logging.error("添加XMP元数据失败: {}".format(e))  # 记录失败日志
-        logging.error("ExifTool错误输出: {}".format(e.stderr))
+        logging.error("添加XMP元数据失败: %s", e)  # 记录失败日志
+        logging.error("ExifTool错误输出: %s", e.stderr)
+        return False  # 返回False
 
-def convert(photo_path, video_path, output_path):
+def start_exiftool(config_path):
+    """
+    以-stay_open模式启动一个常驻的exiftool进程，使多个文件的元数据可以由同一个进程写入。
+    参数通过其标准输入发送，见queue_xmp_metadata。
+    :param config_path: ExifTool配置文件的路径
+    :return: 运行中的exiftool进程
+    """
+    logging.info("ExifTool路径: %s", EXIFTOOL_PATH)
+    logging.info("配置文件路径: %s", config_path)
+    return subprocess.Popen([
+        EXIFTOOL_PATH,  # exiftool的路径
+        '-config', config_path,  # 配置文件的路径
+        '-stay_open', 'True',  # 每条命令执行后继续读取参数
+        '-@', '-',  # 从标准输入读取参数
+        '-common_args', '-charset', 'filename=utf8',  # 文件名以UTF-8文本发送
+    ], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding='utf-8')
+
+def queue_xmp_metadata(exiftool_process, merged_file, offset):
+    """
+    通过start_exiftool启动的常驻exiftool进程向合并的图像添加XMP元数据。
+    会等待exiftool写完文件。
+    :param exiftool_process: 运行中的exiftool进程
+    :param merged_file: 输出文件的路径，此时只包含照片
+    :param offset: 从文件末尾到视频开始部分的字节偏移量
+    :return: 如果写入了XMP元数据，则返回True，否则返回False
+    """
+    if exiftool_process.poll() is not None:  # 如果exiftool已经退出
+        logging.error("添加XMP元数据失败，ExifTool未在运行: %s", merged_file)  # 记录失败日志
+        return False  # 返回False
+    exiftool_process.stdin.write(  # 每行一个参数
+        "-XMP-GCamera:MicroVideo=1\n"  # 设置MicroVideo标志
+        "-XMP-GCamera:MicroVideoVersion=1\n"  # 设置MicroVideo版本
+        "-XMP-GCamera:MicroVideoOffset={}\n"  # 设置MicroVideo偏移量
+        "-XMP-GCamera:MicroVideoPresentationTimestampUs=1500000\n"  # 设置展示时间戳
+        "-overwrite_original\n"  # 覆盖原文件，不生成备份
+        "{}\n"  # 目标文件
+        "-execute\n".format(offset, merged_file))  # 执行命令
+    exiftool_process.stdin.flush()  # 确保exiftool收到完整的命令
+
+    output = []
+    for line in exiftool_process.stdout:  # 读取输出，直到exiftool报告就绪
+        if line.strip() == "{ready}":
+            break
+        output.append(line)
+    else:  # exiftool在命令完成前退出
+        output.append("Error: ExifTool exited unexpectedly\n")
+    logging.info("ExifTool输出: %s", "".join(output))
+    if any(line.startswith("Error") for line in output):  # exiftool以"Error: ..."行报告失败
+        logging.error("添加XMP元数据失败: %s", merged_file)  # 记录失败日志
+        logging.error("ExifTool错误输出: %s", "".join(output))
+        return False  # 返回False
+    logging.info("已向文件添加XMP元数据。")  # 记录成功日志
+    return True  # 返回True
+
+def stop_exiftool(exiftool_process):
+    """
+    停止由start_exiftool启动的常驻exiftool进程。
+    :param exiftool_process: 运行中的exiftool进程
+    :return: None
+    """
+    if exiftool_process.poll() is None:  # 如果exiftool仍在运行
+        exiftool_process.communicate("-stay_open\nFalse\n")  # 通知exiftool退出并等待其结束
+
+def convert(photo_path, video_path, output_path, config_path, exiftool_process=None, force=False):
     """
     执行转换过程，将文件合并为Google Motion Photo。
     :param photo_path: 要合并的照片路径
     :param video_path: 要合并的视频路径
     :param output_path: 输出目录的路径
+    :param config_path: ExifTool配置文件的路径
+    :param exiftool_process: 要使用的常驻exiftool进程，为None时运行一个新的exiftool进程
+    :param force: 即使输出文件已是最新也进行转换
     :return: 如果转换成功，则返回True，否则返回False
     """
-    merged = merge_files(photo_path, video_path, output_path)  # 合并照片和视频文件
-    photo_filesize = os.path.getsize(photo_path)  # 获取照片文件大小
-    merged_filesize = os.path.getsize(merged)  # 获取合并后文件大小
+    out_path = os.path.join(output_path, basename(photo_path))  # 输出文件的路径
+    if not force and exists(out_path):  # 如果输出文件已存在且可以保留
+        out_stat, photo_stat, video_stat = os.stat(out_path), os.stat(photo_path), os.stat(video_path)  # 获取文件信息
+        # 输出文件比照片和视频都新，并且大到足以包含两者时，才是最新的，
+        # 这样照片的普通副本（例如来自--copyall）仍会被转换。
+        if out_stat.st_mtime >= max(photo_stat.st_mtime, video_stat.st_mtime) and out_stat.st_size >= photo_stat.st_size + video_stat.st_size:
+            logging.info("输出文件已是最新，跳过: %s", out_path)  # 记录跳过日志
+            return True  # 输出文件已由之前的运行转换
 
-    # XMP元数据中的'offset'字段应为从文件末尾到合并文件中视频部分开始的偏移量（以字节为单位）。
-    # 合并大小 - 仅照片大小 = 偏移量。
-    offset = merged_filesize - photo_filesize  # 计算偏移量
-    config_path = create_exiftool_config()  # 创建ExifTool配置文件
-    add_xmp_metadata(merged, offset, config_path)  # 添加XMP元数据
-    os.remove(config_path)  # 删除临时配置文件
+    # 输出文件先以临时名称生成，完成后才重命名，
+    # 这样转换失败或中断时不会留下缺少视频的动态照片。
+    part_path = out_path + ".part"  # 未完成的输出文件的路径
+    try:
+        # 在附加视频之前将XMP元数据写入照片的副本，
+        # 这样exiftool只需重写照片，视频也只写入一次。
+        copy_photo(photo_path, part_path)  # 复制照片
 
-def matching_video(photo_path):
+        # XMP元数据中的'offset'字段应为从文件末尾到合并文件中视频部分开始的偏移量（以字节为单位）。
+        # 视频附加在文件末尾，所以偏移量就是视频大小。
+        offset = os.path.getsize(video_path)  # 计算偏移量
+        if exiftool_process is not None:  # 如果提供了常驻的exiftool进程
+            success = queue_xmp_metadata(exiftool_process, part_path, offset)  # 通过它添加XMP元数据
+        else:
+            success = add_xmp_metadata(part_path, offset, config_path)  # 添加XMP元数据
+        if not success:  # 如果无法写入XMP元数据
+            return False  # 返回False
+        append_video(video_path, part_path)  # 附加视频
+        os.replace(part_path, out_path)  # 将完整的输出文件移动到位
+    finally:
+        if exists(part_path):  # 如果转换未完成
+            os.remove(part_path)  # 删除不完整的输出文件，以便下次重新转换
+    return True  # 返回True
+
+def convert_group(pairs, output_path, config_path, exiftool_processes):
     """
-    查找给定照片的匹配视频文件。
-    :param photo_path: 照片文件的路径
-    :return: 匹配的视频文件路径，如果未找到则为空字符串
+    依次转换照片/视频对，使用从队列中取出的常驻exiftool进程。
+    同一组的文件对可能写入同一个输出文件，因此不能并行转换。
+    :param pairs: （照片，视频）路径元组的列表
+    :param output_path: 输出目录的路径
+    :param config_path: ExifTool配置文件的路径
+    :param exiftool_processes: 未被使用的运行中exiftool进程的队列
+    :return: None
     """
-    base = os.path.splitext(photo_path)[0]  # 获取照片文件的基础名称（不含扩展名）
-    logging.info("正在查找与之同名的视频: {}".format(base))  # 记录查找日志
-    for ext in ['.mov', '.mp4', '.MOV', '.MP4']:  # 支持的扩展名列表
-        video_path = base + ext  # 构建视频文件路径
-        if os.path.exists(video_path):  # 如果视频文件存在
-            return video_path  # 返回视频文件路径
-    return ""  # 如果未找到匹配视频文件，则返回空字符串
+    exiftool_process = exiftool_processes.get()  # 取出一个未被使用的exiftool进程
+    try:
+        written = []  # 本组之前的文件对写入的输出文件
+        for photo_path, video_path in pairs:  # 遍历文件对
+            out_path = os.path.join(output_path, basename(photo_path))  # 输出文件的路径
+            # 覆盖之前的文件对写入的输出文件，与逐个转换时一样，最后一个文件对生效
+            force = exists(out_path) and any(exists(path) and os.path.samefile(out_path, path) for path in written)
+            if convert(photo_path, video_path, output_path, config_path, exiftool_process, force):  # 转换文件对
+                written.append(out_path)
+    finally:
+        exiftool_processes.put(exiftool_process)  # 归还exiftool进程
+
+def convert_pairs(pairs, output_path, config_path):
+    """
+    并行转换照片/视频对，每个工作线程使用自己的常驻exiftool进程。
+    :param pairs: （照片，视频）路径元组的列表
+    :param output_path: 输出目录的路径
+    :param config_path: ExifTool配置文件的路径
+    :return: None
+    """
+    # 照片同名（不区分大小写）的文件对可能写入同一个输出文件（取决于文件系统），
+    # 因此将它们分组，每组由一个工作线程转换
+    groups = {}  # 文件对的分组，以小写的照片名称为键
+    for pair in pairs:
+        groups.setdefault(basename(pair[0]).lower(), []).append(pair)
+    if len(groups) == 0:  # 如果没有需要转换的文件对
+        return
+    workers = min(len(groups), os.cpu_count() or 1)  # 工作线程数
+    exiftool_processes = queue.Queue()  # 未被使用的exiftool进程
+    try:
+        for _ in range(workers):
+            exiftool_processes.put(start_exiftool(config_path))  # 为每个工作线程启动一个exiftool进程
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(convert_group, group, output_path, config_path, exiftool_processes) for group in groups.values()]
+            for future in futures:
+                future.result()  # 抛出工作线程中的异常
+    finally:
+        while not exiftool_processes.empty():
+            stop_exiftool(exiftool_processes.get())  # 停止exiftool进程
+
+def scan_directory(dir_path):
+    """
+    使用os.scandir遍历指定目录及其子目录，与os.walk类似，但保留os.DirEntry对象。
+    跳过无法读取的目录，并且不跟随指向目录的符号链接。
+    :param dir_path: 要遍历的目录
+    :return: os.DirEntry列表的生成器，每个目录的文件为一个列表
+    """
+    pending = [dir_path]  # 尚待遍历的目录，没有子目录的目录只需列出一次，无需递归
+    while pending:
+        current = pending.pop()  # 取出下一个目录
+        files = []  # 此目录中的文件
+        subdirs = []  # 此目录的子目录
+        try:
+            with os.scandir(current) as entries:  # 列出目录内容
+                for entry in entries:
+                    if entry.is_dir():  # 如果是目录
+                        if not entry.is_symlink():  # 不跟随符号链接
+                            subdirs.append(entry.path)
+                    else:
+                        files.append(entry)
+        except OSError:  # 如果目录无法读取
+            continue
+        yield files
+        pending.extend(reversed(subdirs))  # 接下来按列出的顺序遍历子目录
 
 def process_directory(file_dir):
     """
     递归遍历指定目录中的文件，生成可以转换的（照片，视频）路径元组列表。
     :param file_dir: 查找照片/视频以转换的目录
-    :return: 包含匹配照片/视频对的列表
+    :return: 包含匹配照片/视频对的列表，以及目录中所有文件的集合
     """
-    logging.info("正在处理目录: {}".format(file_dir))  # 记录处理目录日志
+    logging.info("正在处理目录: %s", file_dir)  # 记录处理目录日志
     
     file_pairs = []  # 初始化文件对列表
-    for root, dirs, files in os.walk(file_dir):  # 递归遍历目录
-        for file in files:  # 遍历文件
-            file_fullpath = join(root, file)  # 获取文件的完整路径
-            if file.lower().endswith(('.jpg', '.jpeg')) and matching_video(file_fullpath) != "":  # 如果文件是JPEG格式且有匹配的视频文件
-                file_pairs.append((file_fullpath, matching_video(file_fullpath)))  # 添加到文件对列表
+    all_files = set()  # 初始化所有文件集
+    for files in scan_directory(file_dir):  # 递归遍历目录
+        photos = []  # 此目录中的照片，格式为（小写的不含扩展名的名称，路径）
+        videos = {}  # 此目录中的视频，以小写的不含扩展名的名称为键
+        for entry in files:  # 遍历文件
+            all_files.add(entry.path)  # 添加到所有文件集
+            name, ext = os.path.splitext(entry.name.lower())  # 将小写的文件名拆分为名称和扩展名
+            if ext in ('.jpg', '.jpeg'):  # 如果文件是JPEG格式
+                photos.append((name, entry.path))
+            elif ext in ('.mov', '.mp4') and (ext == '.mov' or name not in videos):  # 如果文件是MOV或MP4格式，两者都存在时优先使用MOV
+                videos[name] = entry.path
+        for name, photo_path in photos:  # 遍历此目录中的照片
+            video_path = videos.get(name)  # 查找同名的视频
+            if video_path is not None:  # 如果有匹配的视频文件
+                file_pairs.append((photo_path, video_path))  # 添加到文件对列表
+
+    logging.info("找到 %s 对文件。", len(file_pairs))  # 记录找到的文件对数量
+    logging.info("找到的图像/视频对的子集: %s", file_pairs[0:9])  # 记录部分找到的文件对
+    return file_pairs, all_files  # 返回文件对列表和所有文件集
 
-    logging.info("找到 {} 对文件。".format(len(file_pairs)))  # 记录找到的文件对数量
-    logging.info("找到的图像/视频对的子集: {}".format(str(file_pairs[0:9])))  # 记录部分找到的文件对
-    return file_pairs  # 返回文件对列表
+def copy_files(files, output_path):
+    """
+    依次将文件复制到输出目录，保留原始文件的元数据。
+    :param files: 要复制的文件路径列表
+    :param output_path: 输出目录的路径
+    :return: None
+    """
+    for file in files:  # 遍历文件
+        file_name = basename(file)  # 获取文件名
+        destination_path = join(output_path, file_name)  # 构建目标路径
+        shutil.copy2(file, destination_path)  # 复制文件到目标路径（保留原始文件的元数据）
 
 def main(args):
     """
@@ -200,29 +441,34 @@ def main(args):
 
     if args.dir is not None:  # 如果指定了目录参数
         validate_directory(args.dir)  # 验证目录有效性
-        pairs = process_directory(args.dir)  # 处理目录，获取文件对
-        processed_files = set()  # 初始化已处理文件集
-        for pair in pairs:  # 遍历文件对
-            if validate_media(pair[0], pair[1]):  # 验证文件对的有效性
-                convert(pair[0], pair[1], outdir)  # 转换文件对
-                processed_files.add(pair[0])  # 将处理过的文件添加到集合
-                processed_files.add(pair[1])  # 将处理过的文件添加到集合
+        pairs, all_files = process_directory(args.dir)  # 处理目录，获取文件对和所有文件
+        pairs = [pair for pair in pairs if validate_media(pair[0], pair[1])]  # 保留有效的文件对
+        processed_files = set(file for pair in pairs for file in pair)  # 初始化已处理文件集
+        config_path = create_exiftool_config()  # 创建ExifTool配置文件
+        try:
+            convert_pairs(pairs, outdir, config_path)  # 转换文件对
+        finally:
+            os.remove(config_path)  # 删除临时配置文件
 
         if args.copyall:  # 如果指定了复制所有文件参数
             # 将剩余的文件复制到输出目录
-            all_files = set(join(root, file) for root, dirs, files in os.walk(args.dir) for file in files)  # 获取所有文件集
             remaining_files = all_files - processed_files  # 计算剩余文件集
 
-            logging.info("找到 {} 个剩余文件将被复制。".format(len(remaining_files)))  # 记录剩余文件数量
+            logging.info("找到 %s 个剩余文件将被复制。", len(remaining_files))  # 记录剩余文件数量
 
             if len(remaining_files) > 0:  # 如果有剩余文件
                 # 确保目标目录存在
                 os.makedirs(outdir, exist_ok=True)  # 创建输出目录
                 
-                for file in remaining_files:  # 遍历剩余文件
-                    file_name = basename(file)  # 获取文件名
-                    destination_path = join(outdir, file_name)  # 构建目标路径
-                    shutil.copy2(file, destination_path)  # 复制文件到目标路径（保留原始文件的元数据）
+                # 同名（不区分大小写）的文件可能复制到同一个目标路径（取决于文件系统），
+                # 因此将它们分组，每组由一个工作线程复制
+                groups = {}  # 文件的分组，以小写的文件名为键
+                for file in remaining_files:
+                    groups.setdefault(basename(file).lower(), []).append(file)
+                with concurrent.futures.ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:  # 同时复制多个文件
+                    futures = [executor.submit(copy_files, group, outdir) for group in groups.values()]  # 复制文件到目标路径
+                    for future in futures:
+                        future.result()  # 抛出工作线程中的异常
     else:  # 如果未指定目录参数
         if args.photo is None and args.video is None:  # 如果未提供照片和视频参数
             logging.error("需要提供--dir或--photo和--video。")  # 记录错误日志
@@ -233,7 +479,11 @@ def main(args):
             sys.exit(1)  # 退出进程
 
         if validate_media(args.photo, args.video):  # 验证文件的有效性
-            convert(args.photo, args.video, outdir)  # 转换文件
+            config_path = create_exiftool_config()  # 创建ExifTool配置文件
+            try:
+                convert(args.photo, args.video, outdir, config_path)  # 转换文件
+            finally:
+                os.remove(config_path)  # 删除临时配置文件
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(